@@ -3,14 +3,16 @@
 """Tools to run a Desynn instrument as a CPU meter"""
 
 import asyncio
+import collections
+import concurrent.futures
 import enum
 import math
+import os
 import pathlib
-import statistics
 import time
-from typing import Tuple, Optional, List
+from typing import Deque, Dict, Tuple, Optional, List, Union
 
-import psutil  # type: ignore
+import numpy as np
 import pyftdi  # type: ignore
 from pyftdi.spi import SpiController, SpiGpioPort, SpiPort  # type: ignore
 
@@ -39,12 +41,17 @@ DAC_MAX_OUTPUT = 2.004  # Volt
 GPIO_PIN_D6 = 6
 SPI_URL = "ftdi://ftdi:232h/1"
 SPI_FREQUENCY = 12e6
+FTDI_LATENCY_TIMER = 1  # milliseconds
+FTDI_CHUNKSIZE = 4096  # bytes
 CPU_AVERAGING_SAMPLES = 20
 CPU_SAMPLE_TIME = 0.1  # seconds
+DEMO_STEP_TIME = 0.01  # seconds
 SLEEPTIME_PIN_TOGGLE = 0.3  # seconds
 TIMESTAMP_AGE_SLEEP = 3600  # seconds
 TIMESTAMP_AGE_DEMO = 2  # seconds
+TIMESTAMP_CHECK_INTERVAL = 0.5  # seconds
 PATH_TIMESTAMP = "/tmp/cpumeter_timestamp"
+PATH_PROC_STAT = "/proc/stat"
 
 # Adjust to your particular instrument
 AMPLIFIER_GAIN = 11.0
@@ -57,6 +64,11 @@ SCALE_A_END = 1.0  # Turns
 SCALE_B_BEGIN = 0.47  # Turns
 SCALE_B_END = -0.03  # Turns
 
+# Bound to module level names, to avoid attribute lookups in the output path
+_cos = math.cos
+_sin = math.sin
+_TAU = 2.0 * math.pi
+
 
 class State(enum.Enum):
     """CPU measurement state"""
@@ -75,20 +87,30 @@ class Smoother:
         Args:
             number_of_elements: Number of elements to average over
         """
-        self._minlist: List[float] = []
-        self._maxlist: List[float] = []
+        self._minlist: Deque[float] = collections.deque(maxlen=number_of_elements)
+        self._maxlist: Deque[float] = collections.deque(maxlen=number_of_elements)
+        self._minsum: float = 0.0
+        self._maxsum: float = 0.0
         self._number_of_elements: int = number_of_elements
 
-    def _update(self, listinstance: List[float], value: float) -> None:
+    def _update(
+        self, listinstance: Deque[float], runningsum: float, value: float
+    ) -> float:
         """Update a list instance with a new value.
 
+        The oldest value is discarded when the list is full.
+
         Args:
             listinstance:   List instance to be updated
+            runningsum:     Sum of the values in the list instance
             value:          New value
+
+        Returns the updated sum of the values in the list instance.
         """
+        if len(listinstance) == self._number_of_elements:
+            runningsum -= listinstance[0]
         listinstance.append(value)
-        if len(listinstance) > self._number_of_elements:
-            listinstance.pop(0)
+        return runningsum + value
 
     def update(self, values: List[float]) -> None:
         """
@@ -97,14 +119,27 @@ class Smoother:
         Args:
             values: List of floats
         """
-        self._update(self._minlist, min(values))
-        self._update(self._maxlist, max(values))
+        self.update_minmax(min(values), max(values))
+
+    def update_minmax(self, minvalue: float, maxvalue: float) -> None:
+        """
+        Update with an already calculated min and max value.
+
+        Args:
+            minvalue: Min value of the new values
+            maxvalue: Max value of the new values
+        """
+        self._minsum = self._update(self._minlist, self._minsum, minvalue)
+        self._maxsum = self._update(self._maxlist, self._maxsum, maxvalue)
 
     def get_min_and_max(self) -> Tuple[float, float]:
         """
         Return the smoothed min and max values respectively in a tuple
         """
-        return statistics.mean(self._minlist), statistics.mean(self._maxlist)
+        return (
+            self._minsum / len(self._minlist),
+            self._maxsum / len(self._maxlist),
+        )
 
 
 class CpuMonitor:
@@ -118,22 +153,65 @@ class CpuMonitor:
         """
         self._smoother = Smoother(running_average_samples)
         self._sample_time_s = sample_time_s
+        self.start_interval()
+
+    def start_interval(self) -> None:
+        """
+        Start a new measurement interval, for the next call to get_usage().
+
+        Call this when starting to measure after a pause, so the first sample
+        is not an average over the pause.
+        """
+        self._idle, self._total = self._read_cpu_times()
 
-    def get_usage(self) -> Tuple[float, float]:
+    def _read_cpu_times(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the accumulated CPU times for each core from /proc/stat.
+
+        Returns the idle times (including iowait) and the total times
+        as the tuple (idle, total), with one array element per core.
+        Steal time is part of the total, so it counts as busy.
+        """
+        with open(PATH_PROC_STAT) as stat_file:
+            lines = stat_file.read().splitlines()
+        times = np.array(
+            [
+                line.split()[1:9]  # user nice system idle iowait irq softirq steal
+                for line in lines
+                if line.startswith("cpu") and line[3].isdigit()
+            ],
+            dtype=np.int64,
+        )
+        return times[:, 3] + times[:, 4], times.sum(axis=1)
+
+    async def get_usage(self) -> Tuple[float, float]:
         """
         Get filtered CPU usage value.
 
-        Blocks for the sample time set in the constructor.
+        Sleeps for the sample time set in the constructor, without blocking
+        the event loop. The usage is measured since the previous call.
 
         Returns the min and max value of the CPU core utilisation.
         as the tuple (minvalue, maxvalue) where each value is 0.0-1.0
         """
-        self._smoother.update(
-            [
-                x / 100
-                for x in psutil.cpu_percent(interval=self._sample_time_s, percpu=True)
-            ]
+        await asyncio.sleep(self._sample_time_s)
+        idle, total = self._read_cpu_times()
+        while idle.shape != self._idle.shape:
+            # The number of cores has changed, so start a new interval
+            self._idle, self._total = idle, total
+            await asyncio.sleep(self._sample_time_s)
+            idle, total = self._read_cpu_times()
+        total_delta = total - self._total
+        idle_fraction = np.divide(
+            idle - self._idle,
+            total_delta,
+            out=np.ones(total_delta.shape),
+            where=total_delta > 0,
         )
+        self._idle, self._total = idle, total
+        # The iowait counter may go backwards, so keep the usage within range
+        usage = np.clip(1.0 - idle_fraction, 0.0, 1.0)
+        self._smoother.update_minmax(float(usage.min()), float(usage.max()))
         return self._smoother.get_min_and_max()
 
 
@@ -184,43 +262,22 @@ class Calculator:
         self._m_high = self._vout_high / (self._vimax * self._gain)
         self._m_low = self._vout_low / (self._vimax * self._gain)
 
-    def __str__(self) -> str:
-        return "Calculator. mLow {:.2f} mHigh {:.2f}".format(self._m_low, self._m_high)
-
-    def _calc_position(self, rotation: float) -> float:
-        """Calculate the voltage position
-
-        Args:
-            rotation: Indicator rotation in turns.
-                      A value 0 is straight up.
-                      The indicator rotates clockwise, and is straight up
-                      again at a value of 1.
-
-        Return the voltage position, in the range 0-1
-        """
-        return 0.5 * (1 + math.cos((rotation - self._roffset) * 2 * math.pi))
-
-    def _calc_rel_position(self, position: float) -> float:
-        """Calculate the limited relative (voltage) position
+        # Phase constants for cos(a + b) = cos(a)cos(b) - sin(a)sin(b),
+        # with the minus sign folded into the stored sine values.
+        self._phase_constants: List[Tuple[float, float]] = [
+            (
+                _cos((phase - self._roffset) * _TAU),
+                -_sin((phase - self._roffset) * _TAU),
+            )
+            for phase in (0, 1 / 3, 2 / 3)
+        ]
 
-        Args:
-            rotation: Indicator rotation in turns.
-                      A value 0 is straight up.
-                      The indicator rotates clockwise, and is straight up
-                      again at a value of 1.
-
-        Return the relative voltage position (range smaller than 0-1)
-        """
-        return position * (self._m_high - self._m_low) + self._m_low
-
-    def _calc_digital_value(self, rel_position: float) -> int:
-        """Calculate the digital value for sending to the DAC
-
-        Args:
-            rel_position: Relative voltage, range smaller than 0-1
+        # Affine map from position to digital value
+        self._digital_scale = (self._m_high - self._m_low) * self._dmax
+        self._digital_bias = self._m_low * self._dmax
 
-        Returns the digital value for sending to the DAC."""
-        return int(rel_position * self._dmax)
+    def __str__(self) -> str:
+        return "Calculator. mLow {:.2f} mHigh {:.2f}".format(self._m_low, self._m_high)
 
     def _calc_intermediate_voltage(self, digital_value: int) -> float:
         """Calculate the output voltage from the DAC.
@@ -242,43 +299,11 @@ class Calculator:
         """
         return intermediate_voltage * self._gain
 
-    def get_positions(self, rotation: float) -> Tuple[float, float, float]:
-        """Get the voltage positions for a given rotation.
-
-        Args:
-            rotation: Indicator rotation in turns.
-                      A value 0 is straight up.
-                      The indicator rotates clockwise, and is straight up
-                      again at a value of 1.
-
-        Returns the three positions in range 0-1.
-        """
-        return (
-            self._calc_position(rotation),
-            self._calc_position(rotation + 1 / 3),
-            self._calc_position(rotation + 2 / 3),
-        )
-
-    def get_rel_positions(self, rotation: float) -> Tuple[float, float, float]:
-        """Get the relative (voltage) position for a given rotation.
-
-        Args:
-            rotation: Indicator rotation in turns.
-                      A value 0 is straight up.
-                      The indicator rotates clockwise, and is straight up
-                      again at a value of 1.
-
-        Returns the three relative positions (range smaller than 0-1)
-        """
-        pa, pb, pc = self.get_positions(rotation)
-        return (
-            self._calc_rel_position(pa),
-            self._calc_rel_position(pb),
-            self._calc_rel_position(pc),
-        )
-
     def get_digital_values(self, rotation: float) -> Tuple[int, int, int]:
-        """Get the digital values for a given rotation.
+        """Get the digital values for a given rotation, in a single step.
+
+        Calculated directly from the rotation, without the intermediate
+        positions. Intended for the frequently called output path.
 
         Args:
             rotation: Indicator rotation in turns.
@@ -288,11 +313,16 @@ class Calculator:
 
         Returns the three digital values for sending to the DACs.
         """
-        ma, mb, mc = self.get_rel_positions(rotation)
+        theta = rotation * _TAU
+        cr = _cos(theta)
+        sr = _sin(theta)
+        (c0a, s0a), (c0b, s0b), (c0c, s0c) = self._phase_constants
+        scale = self._digital_scale
+        bias = self._digital_bias
         return (
-            self._calc_digital_value(ma),
-            self._calc_digital_value(mb),
-            self._calc_digital_value(mc),
+            int(0.5 * (1 + cr * c0a + sr * s0a) * scale + bias + 0.5),
+            int(0.5 * (1 + cr * c0b + sr * s0b) * scale + bias + 0.5),
+            int(0.5 * (1 + cr * c0c + sr * s0c) * scale + bias + 0.5),
         )
 
     def get_intermediate_voltages(self, rotation: float) -> Tuple[float, float, float]:
@@ -324,29 +354,29 @@ class Calculator:
 
         Returns the three amplifier output voltages in Volt.
         """
-        via, vib, vic = self.get_intermediate_voltages(rotation)
+        da, db, dc = self.get_digital_values(rotation)
         return (
-            self._calc_output_voltage(via),
-            self._calc_output_voltage(vib),
-            self._calc_output_voltage(vic),
+            self._calc_output_voltage(self._calc_intermediate_voltage(da)),
+            self._calc_output_voltage(self._calc_intermediate_voltage(db)),
+            self._calc_output_voltage(self._calc_intermediate_voltage(dc)),
         )
 
 
-def get_file_timestamp_age(timestamp_path: pathlib.Path) -> Optional[float]:
+def get_file_timestamp_age(timestamp_path: Union[str, pathlib.Path]) -> Optional[float]:
     """Get the timestamp age in seconds.
 
     Reads the modification time of the timestamp file.
 
     Args:
-        timestamp_path: Path to timestamp file
+        timestamp_path: Path to timestamp file. A str avoids the path conversion.
 
     Returns the timestamp age in seconds, or None if not found.
     """
-    if not timestamp_path.exists():
+    try:
+        return time.time() - os.path.getmtime(timestamp_path)
+    except FileNotFoundError:
         return None
 
-    return time.time() - timestamp_path.stat().st_mtime
-
 
 class DigOutputPin:
     """Digital output pin"""
@@ -361,6 +391,7 @@ class DigOutputPin:
         self.gpio = gpio
         self.pinnumber = pinnumber
         self._set_direction_out()
+        self._bank: int = self.gpio.read(with_output=True)  # Cached GPIO bank value
 
     @property
     def pinmask(self) -> int:
@@ -402,23 +433,23 @@ class DigOutputPin:
         Args:
             value: True to set the pin high.
         """
-        self.gpio.write(
-            self._calculate_new_combined_value(value, self.gpio.read(with_output=True))
-        )
+        self._bank = self._calculate_new_combined_value(value, self._bank)
+        self.gpio.write(self._bank)
 
     def get_output(self) -> bool:
         """
-        Get the value of digital pin.
+        Get the value of digital pin, as last written.
 
         Return True for high state.
         """
-        return self._extract_pin_state(self.gpio.read(with_output=True))
+        return self._extract_pin_state(self._bank)
 
     def toggle(self) -> None:
         """
         Toggle the state of the pin.
         """
-        self.set_output(not self.get_output())
+        self._bank ^= self.pinmask
+        self.gpio.write(self._bank)
 
 
 class DacChannel:
@@ -447,6 +478,16 @@ class DacChannel:
         self.gain = gain
         self.enabled = enabled
 
+        # Channel number, gain and enabled bits of the first byte to write
+        control_bits = 0
+        if self.channel == DAC_CHANNEL_B:
+            control_bits |= 1 << 15
+        if self.gain == DAC_GAIN_1:
+            control_bits |= 1 << 13
+        if self.enabled:
+            control_bits |= 1 << 12
+        self._control_bits = control_bits >> 8
+
     def _calculate_combined_value(self, value: int) -> Tuple[int, int]:
         """Calculate value to write to DAC.
 
@@ -457,15 +498,10 @@ class DacChannel:
 
         Returns two bytes as an tuple of ints.
         """
-        combined_value = (int(abs(value)) & 0x03FF) << 2
-        if self.channel == DAC_CHANNEL_B:
-            combined_value |= 1 << 15
-        if self.gain == DAC_GAIN_1:
-            combined_value |= 1 << 13
-        if self.enabled:
-            combined_value |= 1 << 12
-
-        return (combined_value >> 8), (combined_value & 0xFF)
+        return (
+            self._control_bits | ((value & 0x03FF) >> 6),
+            (value & 0x3F) << 2,
+        )
 
     def set_output(self, value: int) -> None:
         """
@@ -479,6 +515,85 @@ class DacChannel:
         self.dac_chip.write(self._calculate_combined_value(value))
 
 
+class HardwareFrame:
+    """Collects rotations for several indicators, for writing them together.
+
+    The SPI transactions run in an executor, so the event loop is not blocked
+    while waiting for them.
+    """
+
+    def __init__(self, executor: concurrent.futures.Executor) -> None:
+        """Initialise a hardware frame.
+
+        Args:
+            executor:   Executor for writing to the DACs.
+                        Use a single worker to keep the writes in order.
+        """
+        self._executor = executor
+        self._staged: Dict["Indicator", float] = {}
+        self._flushes_started = 0
+        self._flushes_done = 0
+        self._flushed = asyncio.Event()
+
+    def stage(self, indic: "Indicator", rotation: float) -> None:
+        """Stage an indicator rotation, to be written at the next flush.
+
+        Args:
+            indic:      Indicator instance
+            rotation:   Indicator rotation in turns.
+        """
+        self._staged[indic] = rotation
+
+    @staticmethod
+    def _write(staged: Dict["Indicator", float]) -> None:
+        """Write rotations to the indicators.
+
+        Args:
+            staged: Rotation per indicator instance
+        """
+        for indic, rotation in staged.items():
+            indic.set_output(rotation)
+
+    async def flush(self) -> None:
+        """Write all staged rotations to the indicators."""
+        staged, self._staged = self._staged, {}
+        self._flushes_started += 1
+        flush_number = self._flushes_started
+        if staged:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._write, staged)
+        self._flushes_done = flush_number
+        self._flushed.set()
+        self._flushed.clear()
+
+    async def wait_for_flush(self) -> None:
+        """Wait until the currently staged rotations have been written.
+
+        A flush that is already running has taken its rotations before these
+        were staged, so wait for the flush after it.
+        """
+        flush_number = self._flushes_started + 1
+        while self._flushes_done < flush_number:
+            await self._flushed.wait()
+
+    async def run(self, period: float) -> None:
+        """Flush the staged DAC values periodically.
+
+        The sleep time is adjusted for the time spent flushing, to keep the
+        period constant. After an overrun the schedule restarts from the
+        current time, instead of catching up with back-to-back flushes.
+
+        Args:
+            period: Time between flushes, in seconds
+        """
+        loop = asyncio.get_running_loop()
+        next_deadline = loop.time()
+        while True:
+            await self.flush()
+            next_deadline = max(next_deadline + period, loop.time())
+            await asyncio.sleep(next_deadline - loop.time())
+
+
 class Indicator:
     """Indicator, not considering the printed scale on the front."""
 
@@ -508,9 +623,28 @@ class Indicator:
             dac_2:      DAC 2
         """
         self._calculator = Calculator(roffset, dmax, vimax, gain, vout_low, vout_high)
-        self._dac_0 = dac_0
-        self._dac_1 = dac_1
-        self._dac_2 = dac_2
+        self._dmax = dmax
+        self._dacs = (dac_0, dac_1, dac_2)
+        self._last: Tuple[int, int, int] = (-1, -1, -1)  # Last written values
+
+    @property
+    def dmax(self) -> float:
+        """Digital value for max voltage from DAC"""
+        return self._dmax
+
+    def _get_changed_values(self, rotation: float) -> Optional[Tuple[int, int, int]]:
+        """Get the digital values for a rotation, if they need to be written.
+
+        Args:
+            rotation: Indicator rotation in turns.
+
+        Returns the three digital values, or None if already written.
+        """
+        values = self._calculator.get_digital_values(rotation)
+        if values == self._last:
+            return None
+        self._last = values
+        return values
 
     def set_output(self, rotation: float) -> None:
         """
@@ -522,10 +656,22 @@ class Indicator:
                       The indicator rotates clockwise, and is straight up
                       again at a value of 1.
         """
-        d1, d2, d3 = self._calculator.get_digital_values(rotation)
-        self._dac_0.set_output(d1)
-        self._dac_1.set_output(d2)
-        self._dac_2.set_output(d3)
+        values = self._get_changed_values(rotation)
+        if values is None:
+            return
+        self._write_values(values)
+
+    def _write_values(self, values: Tuple[int, int, int]) -> None:
+        """Write digital values to the DACs, one SPI transaction per channel.
+
+        The MCP4812 latches the data when chip select goes high, so each
+        16-bit frame needs a transaction of its own.
+
+        Args:
+            values: The three digital values
+        """
+        for dac, value in zip(self._dacs, values):
+            dac.set_output(value)
 
 
 class Scale:
@@ -548,56 +694,100 @@ class Scale:
         self._current_rotation: float = 0  # Relative to up
         self.set_scale(0)
 
+    def _quantize(self, value: float) -> float:
+        """Round a value to the DAC resolution, 1/dmax.
+
+        Args:
+            value: Value to round
+
+        Returns the rounded value.
+        """
+        dmax = self._indic.dmax
+        return round(value * dmax) / dmax
+
     def _calc_rotation(self, value: float) -> float:
         """Calculate the rotation of the indicator
 
         Args:
             value: Use 0 for beginning of scale, and 1 for end of scale.
+                   It is rounded to the DAC resolution.
 
         Returns the rotation value.
         """
-        value = min(max(0, value), 1)
+        value = self._quantize(min(max(0, value), 1))
         return self._rot0 + value * self._factor
 
+    def _write_rotation(
+        self, rotation: float, frame: Optional[HardwareFrame] = None
+    ) -> None:
+        """Update the indicator.
+
+        Args:
+            rotation: Indicator rotation in turns.
+            frame:    Stage the update in this hardware frame, instead of
+                      writing it directly.
+        """
+        self._current_rotation = rotation
+        if frame is None:
+            self._indic.set_output(rotation)
+        else:
+            frame.stage(self._indic, rotation)
+
     def get_rotation(self) -> float:
         """Get the current rotation"""
         return self._current_rotation
 
-    def set_scale(self, value: float) -> None:
+    def set_scale(self, value: float, frame: Optional[HardwareFrame] = None) -> None:
         """Set the scale value
 
         Args:
             value: Use 0 for beginning of scale, and 1 for end of scale.
+            frame: Stage the update in this hardware frame, instead of
+                   writing it directly.
         """
-        self._current_rotation = self._calc_rotation(value)
-        self._indic.set_output(self._current_rotation)
+        self._write_rotation(self._calc_rotation(value), frame)
 
-    def set_turns(self, turns: float) -> None:
+    def set_turns(self, turns: float, frame: Optional[HardwareFrame] = None) -> None:
         """Set number of turns relative to beginning of scale.
 
         Args:
             turns: Number of turns. Must be >= 0.
+            frame: Stage the update in this hardware frame, instead of
+                   writing it directly.
         """
         if turns < 0:
             return
         if self._clockwise:
-            self._current_rotation = self._rot0 + turns
+            self._write_rotation(self._rot0 + turns, frame)
         else:
-            self._current_rotation = self._rot0 - turns
-        self._indic.set_output(self._current_rotation)
+            self._write_rotation(self._rot0 - turns, frame)
 
 
 class DemoRunner:
-    def __init__(self, sc: Scale) -> None:
+    def __init__(self, sc: Scale, frame: HardwareFrame) -> None:
         """Demo runner
 
+        Each step is written when the hardware frame is flushed, so several
+        demo runners sharing a frame are updated together.
+
         Args:
             sc:     Scale instance
+            frame:  Hardware frame instance, flushed periodically
         """
         self.sc = sc
+        self._frame = frame
         self._step_size = 0.02
-        self._step_time = 0.01
-        self._allowed_error = self._step_size * 0.7
+
+    def _calc_number_of_steps(self, start: float, end: float) -> int:
+        """Calculate the number of steps for moving from start to end
+
+        Args:
+            start:  Initial value
+            end:    Final value
+
+        Returns the number of steps, each at most the step size.
+        """
+        return math.ceil(abs(end - start) / self._step_size)
 
     async def _rotate_turns_smooth(self, start_turns: float, end_turns: float) -> None:
         """Rotate a number of turns smoothly
@@ -608,18 +798,13 @@ class DemoRunner:
             start_turns:    Initial number of turns
             end_turns:      Final number of turns
         """
-        is_increasing = end_turns > start_turns
-        current_turns = start_turns
-        while True:
-            error = end_turns - current_turns
-            if abs(error) < self._allowed_error:
-                break
-            if is_increasing:
-                current_turns += self._step_size
-            else:
-                current_turns -= self._step_size
-            self.sc.set_turns(current_turns)
-            await asyncio.sleep(self._step_time)
+        number_of_steps = self._calc_number_of_steps(start_turns, end_turns)
+        for step in range(1, number_of_steps + 1):
+            self.sc.set_turns(
+                start_turns + step * (end_turns - start_turns) / number_of_steps,
+                self._frame,
+            )
+            await self._frame.wait_for_flush()
 
     async def _set_scale_smooth(self, start_value: float, end_value: float) -> None:
         """Rotate to a scale position smoothly
@@ -628,22 +813,17 @@ class DemoRunner:
             start_value:    Initial position
             end_value:      Final position
         """
-        is_increasing = end_value > start_value
-        current_value = start_value
-        while True:
-            error = end_value - current_value
-            if abs(error) < self._allowed_error:
-                break
-            if is_increasing:
-                current_value += self._step_size
-            else:
-                current_value -= self._step_size
-            self.sc.set_scale(current_value)
-            await asyncio.sleep(self._step_time)
+        number_of_steps = self._calc_number_of_steps(start_value, end_value)
+        for step in range(1, number_of_steps + 1):
+            self.sc.set_scale(
+                start_value + step * (end_value - start_value) / number_of_steps,
+                self._frame,
+            )
+            await self._frame.wait_for_flush()
 
     async def run(self) -> None:
         """Run the demo"""
-        self.sc.set_scale(0)
+        self.sc.set_scale(0, self._frame)
         await asyncio.sleep(0.2)
         await self._rotate_turns_smooth(0, 1)
         await self._set_scale_smooth(0, 1)
@@ -656,28 +836,49 @@ class Toggler:
         """
         Continously toggle a digital output pin.
 
+        The toggling is paused until enable() is called.
+
         Args:
             pin:       Pin instance to toggle
             sleeptime: Sleep time in seconds
         """
         self._pin = pin
         self._sleeptime = sleeptime
+        self._enabled = asyncio.Event()
+
+    def enable(self) -> None:
+        """Start toggling. The first toggle is done without waiting."""
+        self._enabled.set()
+
+    def disable(self) -> None:
+        """Pause toggling."""
+        self._enabled.clear()
 
     async def run(self) -> None:
         """Run toggling of the pin"""
         while True:
+            await self._enabled.wait()
             self._pin.toggle()
             await asyncio.sleep(self._sleeptime)
 
 
-def set_up_hardware() -> Tuple[Scale, Scale, DigOutputPin]:
+def set_up_hardware(
+    executor: concurrent.futures.Executor,
+) -> Tuple[Scale, Scale, DigOutputPin, HardwareFrame]:
     """
     Set up the hardware.
 
-    Returns the two scale instances and an digital output pin instance.
+    Args:
+        executor:   Executor for writing to the DACs. Use a single worker.
+
+    Returns the two scale instances, an digital output pin instance and
+    a hardware frame instance for updating both scales together.
     """
     spi = SpiController(cs_count=3)
     spi.configure(SPI_URL, frequency=SPI_FREQUENCY)
+    spi.ftdi.set_latency_timer(FTDI_LATENCY_TIMER)
+    spi.ftdi.read_data_set_chunksize(FTDI_CHUNKSIZE)
+    spi.ftdi.write_data_set_chunksize(FTDI_CHUNKSIZE)
 
     gpio = spi.get_gpio()
     digpin = DigOutputPin(gpio, GPIO_PIN_D6)
@@ -718,47 +919,101 @@ def set_up_hardware() -> Tuple[Scale, Scale, DigOutputPin]:
 
     scale_a = Scale(indicator_a, SCALE_A_BEGIN, SCALE_A_END)
     scale_b = Scale(indicator_b, SCALE_B_BEGIN, SCALE_B_END)
+    frame = HardwareFrame(executor)
 
-    return scale_a, scale_b, digpin
+    return scale_a, scale_b, digpin, frame
 
 
-async def main() -> None:
-    """Main CPUmeter application"""
-    scale_a, scale_b, digpin = set_up_hardware()
-    path_timestamp = pathlib.Path(PATH_TIMESTAMP)
+async def run_demos(frame: HardwareFrame, demos: List[DemoRunner]) -> None:
+    """Run demos, while flushing the shared hardware frame periodically.
+
+    An exception from flushing the frame, for example when the FTDI unit
+    is unplugged, stops the demos and is raised.
+
+    Args:
+        frame:  Hardware frame instance shared by the demos
+        demos:  Demo runner instances
+    """
+    frame_task = asyncio.create_task(frame.run(DEMO_STEP_TIME))
+    demos_task = asyncio.gather(*(demo.run() for demo in demos))
+    try:
+        await asyncio.wait(
+            {frame_task, demos_task}, return_when=asyncio.FIRST_COMPLETED
+        )
+        if frame_task.done():
+            frame_task.result()  # The frame task only stops on an exception
+        demos_task.result()
+    finally:
+        frame_task.cancel()
+        demos_task.cancel()
+        await asyncio.gather(frame_task, demos_task, return_exceptions=True)
+    await frame.flush()
+
+
+async def run_cpumeter(executor: concurrent.futures.Executor) -> None:
+    """Run the CPUmeter state machine
+
+    Args:
+        executor:   Executor for writing to the DACs. Use a single worker.
+    """
+    scale_a, scale_b, digpin, frame = set_up_hardware(executor)
     monitor = CpuMonitor(CPU_AVERAGING_SAMPLES, CPU_SAMPLE_TIME)
-    demo_a = DemoRunner(scale_a)
-    demo_b = DemoRunner(scale_b)
+    demo_a = DemoRunner(scale_a, frame)
+    demo_b = DemoRunner(scale_b, frame)
     pintoggler = Toggler(digpin, SLEEPTIME_PIN_TOGGLE)
+    # Keep a reference to the task, so it is not garbage collected
+    pin_task = asyncio.create_task(pintoggler.run())
 
     state = State.SLEEP
+    age: float = 2 * TIMESTAMP_AGE_SLEEP
+    last_check_time: Optional[float] = None  # Monotonic time of last stat
     print("Starting CPU meter application", flush=True)
-    while True:
-        age = get_file_timestamp_age(path_timestamp)
-        if age is None:
-            age = 2 * TIMESTAMP_AGE_SLEEP
-
-        if state != State.DEMO and age < TIMESTAMP_AGE_DEMO:
-            print("Starting demo", flush=True)
-            state = State.DEMO
-        elif state == State.CPU_MEAS and age > TIMESTAMP_AGE_SLEEP:
-            print("Going to sleep", flush=True)
-            state = State.SLEEP
-
-        if state == State.CPU_MEAS:
-            digpin.toggle()
-            mincpu, maxcpu = monitor.get_usage()
-            scale_a.set_scale(mincpu)
-            scale_b.set_scale(maxcpu)
-        elif state == State.DEMO:
-            pin_task = asyncio.create_task(pintoggler.run())
-            await asyncio.gather(demo_a.run(), demo_b.run())
-            pin_task.cancel()
-
-            state = State.CPU_MEAS
-            print("Starting CPU measurement", flush=True)
-        else:
-            await asyncio.sleep(1)
+    try:
+        while True:
+            now = time.monotonic()
+            if (
+                last_check_time is None
+                or now - last_check_time >= TIMESTAMP_CHECK_INTERVAL
+            ):
+                last_check_time = now
+                timestamp_age = get_file_timestamp_age(PATH_TIMESTAMP)
+                if timestamp_age is None:
+                    timestamp_age = 2 * TIMESTAMP_AGE_SLEEP
+                age = timestamp_age
+
+            if state != State.DEMO and age < TIMESTAMP_AGE_DEMO:
+                print("Starting demo", flush=True)
+                state = State.DEMO
+            elif state == State.CPU_MEAS and age > TIMESTAMP_AGE_SLEEP:
+                print("Going to sleep", flush=True)
+                state = State.SLEEP
+
+            if state == State.CPU_MEAS:
+                digpin.toggle()
+                mincpu, maxcpu = await monitor.get_usage()
+                scale_a.set_scale(mincpu, frame)
+                scale_b.set_scale(maxcpu, frame)
+                await frame.flush()
+            elif state == State.DEMO:
+                pintoggler.enable()
+                await run_demos(frame, [demo_a, demo_b])
+                pintoggler.disable()
+                last_check_time = None  # Check the timestamp again after the demo
+
+                monitor.start_interval()
+                state = State.CPU_MEAS
+                print("Starting CPU measurement", flush=True)
+            else:
+                await asyncio.sleep(1)
+    finally:
+        pin_task.cancel()
+        await asyncio.gather(pin_task, return_exceptions=True)
+
+
+async def main() -> None:
+    """Main CPUmeter application"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        await run_cpumeter(executor)
 
 
 if __name__ == "__main__":